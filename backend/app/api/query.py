@@ -5,7 +5,9 @@ Handles natural language queries over indexed documents.
 """
 
 from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi.responses import StreamingResponse
+from typing import Dict, List
+import json
 
 from app.models.schemas import QueryRequest, QueryResponse, SourceInfo, FileInfo
 
@@ -46,22 +48,14 @@ async def query_documents(request: QueryRequest):
     
     try:
         # Execute RAG pipeline
-        result = rag_pipeline.query(
+        result = await rag_pipeline.aquery(
             question=request.question,
             top_k=request.top_k,
             active_files=request.active_files
         )
         
         # Format response
-        sources = [
-            SourceInfo(
-                filename=src['filename'],
-                chunk=src['text'],
-                score=src['score'],
-                chunk_index=src['chunk_index']
-            )
-            for src in result['sources']
-        ]
+        sources = [_source_info(src) for src in result['sources']]
         
         return QueryResponse(
             answer=result['answer'],
@@ -72,6 +66,48 @@ async def query_documents(request: QueryRequest):
         raise HTTPException(status_code=500, detail=f"Query failed: {str(e)}")
 
 
+@router.post("/query/stream")
+async def stream_query_documents(request: QueryRequest):
+    """
+    Query indexed documents, streaming the answer as it is generated.
+    
+    Same pipeline as `/query`, but the response is newline-delimited JSON:
+    first a `{"type": "sources", ...}` event, then `{"type": "answer",
+    "content": ...}` events with pieces of the answer, then `{"type": "done"}`.
+    """
+    if not request.question.strip():
+        raise HTTPException(status_code=400, detail="Question cannot be empty")
+    
+    async def events():
+        try:
+            async for event in rag_pipeline.stream_query(
+                question=request.question,
+                top_k=request.top_k,
+                active_files=request.active_files
+            ):
+                if event['type'] == 'sources':
+                    event = {
+                        'type': 'sources',
+                        'sources': [_source_info(src).model_dump() for src in event['sources']]
+                    }
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            yield json.dumps({'type': 'error', 'detail': f"Query failed: {str(e)}"}) + "\n"
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+def _source_info(src: Dict) -> SourceInfo:
+    """Convert a retrieved chunk into the API's source model."""
+    return SourceInfo(
+        filename=src['filename'],
+        chunk=src['text'],
+        score=src['score'],
+        chunk_index=src['chunk_index']
+    )
+
+
 @router.get("/files", response_model=List[FileInfo])
 async def list_files():
     """
@@ -81,30 +117,12 @@ async def list_files():
         List of files with metadata
     """
     try:
-        filenames = vector_store.get_all_filenames()
-        
-        # Count chunks per file
-        file_info = []
-        for filename in filenames:
-            num_chunks = sum(
-                1 for meta in vector_store.metadata 
-                if meta['filename'] == filename
-            )
-            
-            # Get file type from first chunk
-            file_type = next(
-                (meta['file_type'] for meta in vector_store.metadata 
-                 if meta['filename'] == filename),
-                'unknown'
-            )
-            
-            file_info.append(FileInfo(
-                filename=filename,
-                file_type=file_type,
-                num_chunks=num_chunks
-            ))
-        
-        return file_info
+        # Per-file counts are maintained by the vector store, so this is a
+        # single pass over files rather than over every chunk
+        return [
+            FileInfo(filename=filename, file_type=file_type, num_chunks=num_chunks)
+            for filename, file_type, num_chunks in vector_store.get_file_stats()
+        ]
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list files: {str(e)}")
@@ -5,6 +5,7 @@ Handles file upload, text extraction, chunking, and indexing.
 """
 
 from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pathlib import Path
 import shutil
 from typing import Dict
@@ -15,6 +16,10 @@ from app.rag.chunker import TextChunker
 
 router = APIRouter()
 
+# Extensions that are stored under a canonical file type, so the same
+# format is never listed under two labels
+FILE_TYPE_ALIASES = {'markdown': 'md'}
+
 # These will be injected by main.py
 vector_store = None
 embedder = None
@@ -48,45 +53,50 @@ async def upload_file(file: UploadFile = File(...)):
     """
     # Validate file type
     allowed_extensions = {'.pdf', '.txt', '.md', '.markdown', '.docx'}
-    file_path = Path(file.filename)
+    extension = Path(file.filename).suffix.lower()
     
-    if file_path.suffix.lower() not in allowed_extensions:
+    if extension not in allowed_extensions:
         raise HTTPException(
             status_code=400,
             detail=f"Unsupported file type. Allowed: {', '.join(allowed_extensions)}"
         )
     
     # Save uploaded file
+    # Blocking file I/O and parsing run in worker threads so a large upload
+    # doesn't stall the event loop (and every concurrent /query request)
     save_path = uploads_dir / file.filename
     try:
         with open(save_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+            await run_in_threadpool(shutil.copyfileobj, file.file, buffer, 1024 * 1024)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
     
     # Extract text from file
     try:
-        text = FileProcessor.extract_text(str(save_path))
+        text = await FileProcessor.extract_text_async(str(save_path))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to extract text: {str(e)}")
     
     if not text.strip():
         raise HTTPException(status_code=400, detail="No text content found in file")
     
-    # Chunk the text
-    file_type = file_path.suffix.lstrip('.')
+    # Chunk the text (file_type is stored on every chunk and reused by /files)
+    file_type = extension.lstrip('.')
+    file_type = FILE_TYPE_ALIASES.get(file_type, file_type)
     chunks = chunker.chunk_text(text, file.filename, file_type)
     
     # Embed chunks
     try:
         chunk_texts = [chunk['text'] for chunk in chunks]
-        embeddings = embedder.embed_text(chunk_texts)
+        embeddings = await embedder.embed_text_async(chunk_texts)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to embed text: {str(e)}")
     
     # Store in vector database
+    # Adds can flush to disk or retrain the index, and wait on the store
+    # lock during a periodic flush, so they run in a worker thread
     try:
-        vector_store.add_vectors(embeddings, chunks)
+        await run_in_threadpool(vector_store.add_vectors, embeddings, chunks)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to store vectors: {str(e)}")
     
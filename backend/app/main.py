@@ -7,6 +7,7 @@ This module initializes all RAG components and sets up API routes.
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
+import asyncio
 import sys
 
 # Add parent directory to path for imports
@@ -77,6 +78,21 @@ app.include_router(query.router, prefix="/api", tags=["query"])
 print("RAG system initialized successfully!")
 
 
+@app.on_event("startup")
+async def startup():
+    """Start background workers."""
+    app.state.flush_task = asyncio.create_task(vector_store.run_periodic_flush(interval=5.0))
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop background workers and write any pending index changes."""
+    app.state.flush_task.cancel()
+    await embedder.stop_batching()
+    await rag_pipeline.aclose()
+    vector_store.flush()
+
+
 @app.get("/")
 async def root():
     """Health check endpoint."""
@@ -6,8 +6,10 @@ context preservation during retrieval. Overlapping chunks ensure that
 important information at chunk boundaries isn't lost.
 """
 
-from typing import List, Dict
-import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+from typing import List, Dict, Optional, Tuple
+import os
 
 
 class TextChunker:
@@ -46,11 +48,8 @@ class TextChunker:
         Returns:
             List of dicts containing chunk text and metadata
         """
-        # Clean and normalize text
-        text = self._clean_text(text)
-        
-        # Split into words
-        words = text.split()
+        # Clean and normalize text, keeping the word list for chunking
+        text, words = self._clean_text(text)
         
         if len(words) <= self.words_per_chunk:
             # Document is smaller than one chunk
@@ -62,49 +61,67 @@ class TextChunker:
                 'total_chunks': 1
             }]
         
-        chunks = []
-        chunk_index = 0
-        start_idx = 0
+        # Start offset of every word in the normalized text (plus one past the
+        # end), so each chunk is a single slice instead of a join over words
+        offsets = [0, *accumulate(len(word) + 1 for word in words)]
         
-        while start_idx < len(words):
-            # Extract chunk
-            end_idx = start_idx + self.words_per_chunk
-            chunk_words = words[start_idx:end_idx]
-            chunk_text = ' '.join(chunk_words)
-            
-            chunks.append({
-                'text': chunk_text,
+        # Each chunk starts `step` words after the previous one; the last
+        # chunk is the first whose end reaches the end of the document
+        step = self.words_per_chunk - self.words_overlap
+        num_words = len(words)
+        total = -(-(num_words - self.words_per_chunk) // step) + 1
+        
+        return [
+            {
+                'text': text[offsets[start]:offsets[min(start + self.words_per_chunk, num_words)] - 1],
                 'filename': filename,
                 'file_type': file_type,
                 'chunk_index': chunk_index,
-                'total_chunks': None  # Will update after
-            })
-            
-            # Move to next chunk with overlap
-            start_idx += (self.words_per_chunk - self.words_overlap)
-            chunk_index += 1
-            
-            # Break if we've covered all words
-            if end_idx >= len(words):
-                break
+                'total_chunks': total
+            }
+            for chunk_index, start in enumerate(range(0, total * step, step))
+        ]
+    
+    def chunk_batch(self, docs: List[Tuple[str, str, str]],
+                    max_workers: Optional[int] = None) -> List[List[Dict]]:
+        """
+        Chunk several documents in parallel.
+        
+        Chunking is pure-Python CPU work, so documents are spread across a
+        process pool (one worker per CPU by default) rather than threads.
+        A single document is chunked in-process to avoid pool startup cost.
         
-        # Update total chunks count
-        total = len(chunks)
-        for chunk in chunks:
-            chunk['total_chunks'] = total
+        Args:
+            docs: (text, filename, file_type) tuples
+            max_workers: Number of worker processes (defaults to CPU count)
             
-        return chunks
+        Returns:
+            One list of chunk dicts per document, in input order
+        """
+        if len(docs) <= 1:
+            return [self.chunk_text(*doc) for doc in docs]
+        
+        workers = min(len(docs), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self._chunk_doc, docs))
     
-    def _clean_text(self, text: str) -> str:
+    def _chunk_doc(self, doc: Tuple[str, str, str]) -> List[Dict]:
+        """Chunk one (text, filename, file_type) tuple (picklable for the pool)."""
+        return self.chunk_text(*doc)
+    
+    def _clean_text(self, text: str) -> Tuple[str, List[str]]:
         """
         Clean and normalize text.
         
         - Remove excessive whitespace
         - Normalize line breaks
-        - Remove special characters that might interfere with chunking
+        - Remove leading/trailing whitespace
+        
+        Returns:
+            The normalized text and its list of words
         """
-        # Replace multiple spaces with single space
-        text = re.sub(r'\s+', ' ', text)
-        # Remove leading/trailing whitespace
-        text = text.strip()
-        return text
\ No newline at end of file
+        # str.split() with no separator splits on any run of whitespace
+        # (including line breaks) in a single C-level pass, several times
+        # faster than a regex substitution
+        words = text.split()
+        return ' '.join(words), words
\ No newline at end of file
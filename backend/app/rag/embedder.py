@@ -6,8 +6,10 @@ that can be used for semantic similarity search.
 """
 
 from sentence_transformers import SentenceTransformer
+import asyncio
 import numpy as np
-from typing import List, Union
+import torch
+from typing import List, Optional, Union
 
 
 class LocalEmbedder:
@@ -24,24 +26,78 @@ class LocalEmbedder:
     Alternative considered: 'all-mpnet-base-v2' (higher quality but 2x slower)
     """
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    # Upper token limits of the length buckets used when embedding batches.
+    # Texts are grouped so each batch is padded only to its bucket's length;
+    # anything longer than the last limit goes into a final open bucket.
+    TOKEN_BUCKETS = (64, 128, 256)
+    # Rough characters-per-token ratio for English, used to bucket texts
+    # without running the tokenizer twice
+    CHARS_PER_TOKEN = 4
+    
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", precision: str = "fp32",
+                 max_batch_size: int = 128, max_wait_ms: float = 5.0):
         """
         Initialize the embedding model.
         
         Args:
             model_name: HuggingFace model identifier
+            precision: Inference precision:
+                - "fp32": full precision (default)
+                - "int8": dynamic INT8 quantization of Linear layers, CPU only.
+                  Roughly 2x faster encoding with negligible retrieval loss.
+                - "fp16": half precision, CUDA only
+            max_batch_size: Max texts coalesced into one batch by `embed_text_async`
+            max_wait_ms: Max time `embed_text_async` waits for more requests
+                to join a batch before encoding
         """
         print(f"Loading embedding model: {model_name}...")
+        self.model_name = model_name
+        self.precision = precision
         self.model = SentenceTransformer(model_name)
+        self._apply_precision()
         self.embedding_dim = self.model.get_sentence_embedding_dimension()
         print(f"Model loaded. Embedding dimension: {self.embedding_dim}")
         
-    def embed_text(self, text: Union[str, List[str]]) -> np.ndarray:
+        # Dynamic batching state; the worker starts on first async request
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._batch_queue: Optional[asyncio.Queue] = None
+        self._batch_worker: Optional[asyncio.Task] = None
+    
+    def _apply_precision(self):
+        """Convert the loaded model to the requested inference precision."""
+        device = self.model.device.type
+        
+        if self.precision == "fp32":
+            return
+        elif self.precision == "int8":
+            if device != "cpu":
+                raise ValueError("INT8 quantization is only supported on CPU")
+            # Quantize weights of the transformer's Linear layers ahead of time;
+            # activations are quantized on the fly per batch
+            self.model = torch.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        elif self.precision == "fp16":
+            if device != "cuda":
+                raise ValueError("FP16 inference requires a CUDA device")
+            self.model.half()
+        else:
+            raise ValueError(f"Unsupported precision: {self.precision}")
+        
+    def embed_text(self, text: Union[str, List[str]], batch_size: int = 64) -> np.ndarray:
         """
         Convert text to embedding vector(s).
         
+        Texts are sorted by length and encoded in length buckets, so short
+        chunks are never padded up to the longest chunk of the document.
+        Results are returned in input order.
+        
         Args:
             text: Single string or list of strings to embed
+            batch_size: Texts per batch for ~128-token inputs; shorter buckets
+                use proportionally larger batches and longer ones smaller,
+                keeping the padded tokens per batch roughly constant
             
         Returns:
             Numpy array of shape (embedding_dim,) for single text
@@ -54,18 +110,126 @@ class LocalEmbedder:
         else:
             return_single = False
             
-        # Generate embeddings
+        if len(text) == 1:
+            # Nothing to pad against (e.g. a query); skip the bucketing
+            embeddings = self._encode(text, batch_size=1)
+        else:
+            embeddings = self._encode_bucketed(text, batch_size)
+        
+        if return_single:
+            return embeddings[0]
+        return embeddings
+    
+    def _encode_bucketed(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """
+        Encode texts grouped into token-length buckets, in input order.
+        
+        Texts are argsorted by length and each bucket is encoded separately,
+        then results are scattered back to their original positions.
+        """
+        lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+        order = np.argsort(lengths, kind='stable')
+        sorted_tokens = lengths[order] // self.CHARS_PER_TOKEN
+        bucket_ends = list(np.searchsorted(sorted_tokens, self.TOKEN_BUCKETS, side='right'))
+        bucket_ends.append(len(texts))
+        
+        embeddings = np.empty((len(texts), self.embedding_dim), dtype=np.float32)
+        bucket_limits = self.TOKEN_BUCKETS + (2 * self.TOKEN_BUCKETS[-1],)
+        start = 0
+        for limit, end in zip(bucket_limits, bucket_ends):
+            if end == start:
+                continue
+            bucket = order[start:end]
+            embeddings[bucket] = self._encode(
+                [texts[i] for i in bucket],
+                batch_size=max(1, batch_size * 128 // limit)
+            )
+            start = end
+        return embeddings
+    
+    def _encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """Run the model on texts that share a batch size."""
         # normalize_embeddings=True ensures vectors are unit length
         # This makes cosine similarity equivalent to dot product
-        embeddings = self.model.encode(
-            text,
+        return self.model.encode(
+            texts,
+            batch_size=batch_size,
             normalize_embeddings=True,
-            show_progress_bar=len(text) > 10  # Show progress for large batches
+            convert_to_numpy=True,
+            show_progress_bar=len(texts) > 10  # Show progress for large batches
         )
+    
+    async def embed_text_async(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts via the shared batching worker.
         
-        if return_single:
-            return embeddings[0]
-        return embeddings
+        Concurrent callers (e.g. several uploads at once) are coalesced into a
+        single `embed_text` call instead of each running its own forward
+        passes, and encoding runs off the event loop.
+        
+        Args:
+            texts: List of strings to embed
+            
+        Returns:
+            Numpy array of shape (len(texts), embedding_dim)
+        """
+        if self._batch_worker is None or self._batch_worker.done():
+            self._batch_queue = asyncio.Queue()
+            self._batch_worker = asyncio.create_task(self._run_batch_worker())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._batch_queue.put((texts, future))
+        return await future
+    
+    async def stop_batching(self):
+        """Stop the batching worker (called on application shutdown)."""
+        if self._batch_worker is not None:
+            self._batch_worker.cancel()
+            try:
+                await self._batch_worker
+            except asyncio.CancelledError:
+                pass
+            self._batch_worker = None
+    
+    async def _run_batch_worker(self):
+        """
+        Drain queued requests into batches and scatter results back.
+        
+        A batch closes once it holds `max_batch_size` texts or `max_wait_ms`
+        has passed since its first request, whichever comes first.
+        """
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            requests = [await self._batch_queue.get()]
+            total = len(requests[0][0])
+            deadline = loop.time() + self.max_wait_ms / 1000
+            
+            while total < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(self._batch_queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                requests.append(request)
+                total += len(request[0])
+            
+            batch = [text for texts, _ in requests for text in texts]
+            try:
+                embeddings = await asyncio.to_thread(self.embed_text, batch)
+            except Exception as e:
+                for _, future in requests:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            offset = 0
+            for texts, future in requests:
+                if not future.done():
+                    future.set_result(embeddings[offset:offset + len(texts)])
+                offset += len(texts)
     
     def embed_query(self, query: str) -> np.ndarray:
         """
@@ -82,3 +246,15 @@ class LocalEmbedder:
     def get_embedding_dimension(self) -> int:
         """Return the dimension of embedding vectors."""
         return self.embedding_dim
+    
+    @property
+    def fingerprint(self) -> str:
+        """
+        Identify the model configuration that produced an embedding.
+        
+        Used as part of cache keys so that swapping the model (or its
+        tokenizer) never serves vectors from a different embedding space.
+        """
+        tokenizer = getattr(self.model, 'tokenizer', None)
+        tokenizer_name = type(tokenizer).__name__ if tokenizer is not None else 'none'
+        return f"{self.model_name}|{tokenizer_name}|{self.embedding_dim}|{self.precision}"
@@ -12,10 +12,15 @@ RAG is a technique that enhances LLM responses by:
 - Reducing hallucinations by providing explicit context
 """
 
+import asyncio
+import httpx
 import requests
-from typing import List, Dict, Optional
+import numpy as np
+from typing import AsyncIterator, List, Dict, Optional
 import json
 
+from app.utils.cache import LRUCache, fingerprint
+
 
 class RAGPipeline:
     """
@@ -43,7 +48,10 @@ Question: {question}
 
 Answer based on the context above:"""
     
-    def __init__(self, vector_store, embedder, llm_endpoint: str = "http://localhost:11434/api/generate"):
+    NO_RESULTS_ANSWER = "No relevant information found in the indexed documents."
+    
+    def __init__(self, vector_store, embedder, llm_endpoint: str = "http://localhost:11434/api/generate",
+                 embedding_cache_size: int = 1024, answer_cache_size: int = 256):
         """
         Initialize RAG pipeline.
         
@@ -51,11 +59,21 @@ Answer based on the context above:"""
             vector_store: FAISSVectorStore instance
             embedder: LocalEmbedder instance
             llm_endpoint: Ollama API endpoint for local LLM
+            embedding_cache_size: Max cached question embeddings (0 disables)
+            answer_cache_size: Max cached LLM answers (0 disables)
         """
         self.vector_store = vector_store
         self.embedder = embedder
         self.llm_endpoint = llm_endpoint
         
+        # Repeated questions skip the embedding forward pass, and repeated
+        # prompts (same question + same retrieved chunks) skip the LLM call
+        self.embedding_cache = LRUCache(embedding_cache_size)
+        self.answer_cache = LRUCache(answer_cache_size)
+        
+        # Async HTTP client for Ollama, created on first async request
+        self._http_client: Optional[httpx.AsyncClient] = None
+        
     def query(self, question: str, top_k: int = 5, 
               active_files: Optional[List[str]] = None) -> Dict:
         """
@@ -71,8 +89,8 @@ Answer based on the context above:"""
                 - answer: Generated response
                 - sources: Retrieved chunks with scores
         """
-        # Step 1: Embed the question
-        query_embedding = self.embedder.embed_query(question)
+        # Step 1: Embed the question (cached for repeated questions)
+        query_embedding = self._embed_question(question)
         
         # Step 2: Retrieve relevant chunks
         retrieved_chunks = self.vector_store.search(
@@ -83,16 +101,12 @@ Answer based on the context above:"""
         
         if not retrieved_chunks:
             return {
-                'answer': "No relevant information found in the indexed documents.",
+                'answer': self.NO_RESULTS_ANSWER,
                 'sources': []
             }
         
         # Step 3: Construct prompt with retrieved context
-        context_str = self._format_context(retrieved_chunks)
-        prompt = self.PROMPT_TEMPLATE.format(
-            context=context_str,
-            question=question
-        )
+        prompt = self._build_prompt(question, retrieved_chunks)
         
         # Step 4: Generate answer using LLM
         answer = self._generate_answer(prompt)
@@ -102,6 +116,97 @@ Answer based on the context above:"""
             'sources': retrieved_chunks
         }
     
+    async def aquery(self, question: str, top_k: int = 5,
+                     active_files: Optional[List[str]] = None) -> Dict:
+        """
+        Async version of `query` for use inside the API's event loop.
+        
+        Embedding runs in a worker thread and the LLM call uses a non-blocking
+        HTTP client, so other requests are served while an answer is generated.
+        """
+        retrieved_chunks = await self._aretrieve(question, top_k, active_files)
+        if not retrieved_chunks:
+            return {
+                'answer': self.NO_RESULTS_ANSWER,
+                'sources': []
+            }
+        
+        prompt = self._build_prompt(question, retrieved_chunks)
+        answer = "".join([piece async for piece in self._agenerate_answer(prompt)]).strip()
+        
+        return {
+            'answer': answer,
+            'sources': retrieved_chunks
+        }
+    
+    async def stream_query(self, question: str, top_k: int = 5,
+                           active_files: Optional[List[str]] = None) -> AsyncIterator[Dict]:
+        """
+        Execute the RAG pipeline, streaming the answer as it is generated.
+        
+        Yields:
+            - {'type': 'sources', 'sources': [...]} once retrieval is done
+            - {'type': 'answer', 'content': str} for each piece of the answer
+            - {'type': 'done'} at the end
+        """
+        retrieved_chunks = await self._aretrieve(question, top_k, active_files)
+        yield {'type': 'sources', 'sources': retrieved_chunks}
+        
+        if not retrieved_chunks:
+            yield {'type': 'answer', 'content': self.NO_RESULTS_ANSWER}
+        else:
+            prompt = self._build_prompt(question, retrieved_chunks)
+            async for piece in self._agenerate_answer(prompt):
+                yield {'type': 'answer', 'content': piece}
+        
+        yield {'type': 'done'}
+    
+    async def aclose(self):
+        """Close the async HTTP client (called on application shutdown)."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+    
+    async def _aretrieve(self, question: str, top_k: int,
+                         active_files: Optional[List[str]]) -> List[Dict]:
+        """
+        Embed the question and search the vector store off the event loop.
+        
+        The search waits on the store lock while an add or flush is in
+        progress, so it runs in a worker thread too.
+        """
+        query_embedding = await asyncio.to_thread(self._embed_question, question)
+        return await asyncio.to_thread(
+            self.vector_store.search,
+            query_embedding,
+            top_k=top_k,
+            filter_filenames=active_files
+        )
+    
+    def _build_prompt(self, question: str, chunks: List[Dict]) -> str:
+        """Construct the LLM prompt from the question and retrieved chunks."""
+        return self.PROMPT_TEMPLATE.format(
+            context=self._format_context(chunks),
+            question=question
+        )
+    
+    def _embed_question(self, question: str) -> np.ndarray:
+        """
+        Embed a question, reusing the cached vector for repeated questions.
+        
+        The key covers the embedder fingerprint and the whitespace-normalized
+        question, so a model swap never returns stale vectors. A copy is
+        returned so callers can't mutate the cached array.
+        """
+        normalized = ' '.join(question.split())
+        key = fingerprint(self.embedder.fingerprint, normalized)
+        
+        embedding = self.embedding_cache.get(key)
+        if embedding is None:
+            embedding = self.embedder.embed_query(normalized)
+            self.embedding_cache.put(key, embedding)
+        return embedding.copy()
+    
     def _format_context(self, chunks: List[Dict]) -> str:
         """
         Format retrieved chunks into context string.
@@ -129,35 +234,123 @@ Answer based on the context above:"""
             
         Note: This assumes Ollama is running locally on default port 11434.
         Fallback to a simple response if Ollama is not available.
+        
+        Answers are cached by prompt, which already contains the question and
+        the retrieved chunk texts, so identical retrievals skip the LLM call.
+        Fallback responses and empty answers are never cached.
+        """
+        key = fingerprint(model, prompt)
+        answer = self.answer_cache.get(key)
+        if answer is not None:
+            return answer
+        
+        answer = self._request_completion(prompt, model)
+        if not answer:
+            return self._fallback_answer(prompt)
+        
+        self.answer_cache.put(key, answer)
+        return answer
+    
+    def _request_completion(self, prompt: str, model: str) -> Optional[str]:
+        """
+        Call the Ollama generate API.
+        
+        Returns:
+            Generated answer text, or None if the LLM is unavailable
         """
         try:
             # Call Ollama API
-            payload = {
-                "model": model,
-                "prompt": prompt,
-                "system": self.SYSTEM_PROMPT,
-                "stream": False,
-                "options": {
-                    "temperature": 0.7,
-                    "top_p": 0.9,
-                }
-            }
-            
             response = requests.post(
                 self.llm_endpoint,
-                json=payload,
+                json=self._llm_payload(prompt, model, stream=False),
                 timeout=60
             )
             
             if response.status_code == 200:
                 result = response.json()
+                if 'error' in result:
+                    print(f"LLM request failed: {result['error']}")
+                    return None
                 return result.get('response', '').strip()
             else:
-                return self._fallback_answer(prompt)
+                return None
                 
         except requests.exceptions.RequestException as e:
             print(f"LLM request failed: {e}")
-            return self._fallback_answer(prompt)
+            return None
+    
+    async def _agenerate_answer(self, prompt: str, model: str = "llama3.2") -> AsyncIterator[str]:
+        """
+        Stream an answer from Ollama piece by piece.
+        
+        Same caching and fallback behaviour as `_generate_answer`: a cached
+        answer is yielded whole, and the fallback is used if the LLM fails
+        before producing any output. Only a non-empty answer from a stream
+        that finished with `done` is cached, never a partial or empty one.
+        """
+        key = fingerprint(model, prompt)
+        answer = self.answer_cache.get(key)
+        if answer is not None:
+            yield answer
+            return
+        
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(timeout=httpx.Timeout(60.0, connect=5.0))
+        
+        pieces = []
+        done = False
+        try:
+            async with self._http_client.stream(
+                "POST", self.llm_endpoint, json=self._llm_payload(prompt, model, stream=True)
+            ) as response:
+                if response.status_code != 200:
+                    yield self._fallback_answer(prompt)
+                    return
+                
+                # Ollama streams one JSON object per line
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    try:
+                        result = json.loads(line)
+                    except ValueError:
+                        print(f"LLM request failed: invalid response line {line[:200]!r}")
+                        break
+                    if 'error' in result:
+                        print(f"LLM request failed: {result['error']}")
+                        break
+                    piece = result.get('response', '')
+                    if not pieces:
+                        piece = piece.lstrip()
+                    if piece:
+                        pieces.append(piece)
+                        yield piece
+                    if result.get('done'):
+                        done = True
+                        break
+        except httpx.HTTPError as e:
+            print(f"LLM request failed: {e}")
+        
+        if not pieces:
+            yield self._fallback_answer(prompt)
+            return
+        
+        answer = "".join(pieces).strip()
+        if done and answer:
+            self.answer_cache.put(key, answer)
+    
+    def _llm_payload(self, prompt: str, model: str, stream: bool) -> Dict:
+        """Build the Ollama generate API request body."""
+        return {
+            "model": model,
+            "prompt": prompt,
+            "system": self.SYSTEM_PROMPT,
+            "stream": stream,
+            "options": {
+                "temperature": 0.7,
+                "top_p": 0.9,
+            }
+        }
     
     def _fallback_answer(self, prompt: str) -> str:
         """
@@ -12,6 +12,10 @@ import faiss
 import numpy as np
 import pickle
 import os
+import asyncio
+import threading
+import pyarrow as pa
+import pyarrow.parquet as pq
 from typing import List, Dict, Tuple
 from pathlib import Path
 
@@ -22,22 +26,76 @@ class FAISSVectorStore:
     
     Stores embeddings and associated metadata (filename, chunk text, etc.)
     Supports persistence across restarts.
+    
+    Metadata is stored column-wise (one array per field, indexed by vector
+    id) so filters and lookups over search results are vectorized numpy
+    operations instead of per-chunk dict access.
     """
     
-    def __init__(self, embedding_dim: int, storage_path: str = "data/vectordb"):
+    # IVF+PQ layout used once the corpus is large enough to train on.
+    # One 8-bit PQ code per 8 dimensions compresses a 384-d float32
+    # vector (1536 bytes) down to 48 bytes.
+    IVF_NLIST = 256
+    PQ_DIMS_PER_CODE = 8
+    
+    # HNSW graph parameters: neighbours per node, and candidate list sizes
+    # while building and searching (higher = better recall, slower)
+    HNSW_M = 32
+    HNSW_EF_CONSTRUCTION = 200
+    HNSW_EF_SEARCH = 64
+    
+    # Filtered searches selecting at most this many vectors are scored
+    # exactly against the raw embeddings rather than through the index
+    EXACT_FILTER_MAX_VECTORS = 50000
+    
+    # Adds only update memory; the store is flushed to disk once this many
+    # vectors are pending, by the periodic flush task, or on shutdown
+    FLUSH_AFTER_VECTORS = 1024
+    # Each save appends new metadata rows as a Parquet part file; once this
+    # many parts exist they are compacted into one
+    MAX_METADATA_PARTS = 64
+    
+    def __init__(self, embedding_dim: int, storage_path: str = "data/vectordb",
+                 index_type: str = "ivfpq", train_threshold: int = 10000, nprobe: int = 8):
         """
         Initialize FAISS vector store.
         
         Args:
             embedding_dim: Dimension of embedding vectors
             storage_path: Directory to persist index and metadata
+            index_type: Index layout for new indexes:
+                - "ivfpq": exhaustive FP16 search, migrated to a trained
+                  IVF+PQ index at `train_threshold` vectors (smallest index)
+                - "hnsw": HNSW graph over full vectors; ~99% recall, no
+                  training step, larger index than PQ
+            train_threshold: Number of vectors after which the flat index is
+                replaced by a trained IVF+PQ index
+            nprobe: Number of IVF cells visited per query once trained
         """
+        if index_type not in ("ivfpq", "hnsw"):
+            raise ValueError(f"Unsupported index type: {index_type}")
+        
         self.embedding_dim = embedding_dim
+        self.index_type = index_type
+        self.train_threshold = train_threshold
+        self.nprobe = nprobe
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
         
         self.index_path = self.storage_path / "faiss.index"
-        self.metadata_path = self.storage_path / "metadata.pkl"
+        # Columnar metadata (filename, file_type, chunk_index, text) as
+        # append-only Parquet parts, so saves only write the new rows
+        self.metadata_dir = self.storage_path / "metadata"
+        self.metadata_dir.mkdir(exist_ok=True)
+        self.legacy_metadata_path = self.storage_path / "metadata.pkl"
+        # Raw float32 embeddings, one row per vector, in index order.
+        # Kept alongside the (possibly lossy) index so it can be rebuilt
+        # after deletes or retrained without re-embedding any text.
+        self.embeddings_path = self.storage_path / "vectors.f32"
+        
+        # Flushes run on a worker thread, so mutations and saves are serialized
+        self._lock = threading.RLock()
+        self._pending_vectors = 0
         
         # Initialize or load index
         if self.index_path.exists():
@@ -49,33 +107,355 @@ class FAISSVectorStore:
         """
         Create a new FAISS index.
         
-        Using IndexFlatL2 for exact search with L2 (Euclidean) distance.
-        Since embeddings are normalized, L2 distance is equivalent to cosine similarity.
-        
-        For larger datasets (>100k vectors), consider IndexIVFFlat for approximate search.
+        All index types use inner product: since embeddings are normalized,
+        inner product equals cosine similarity. See `_new_index` for layouts.
         """
-        self.index = faiss.IndexFlatL2(self.embedding_dim)
-        self.metadata = []  # Stores metadata for each vector
+        self.index = self._new_index()
+        self._reset_metadata()
+        self._rewrite_metadata = True
+        self._persisted_rows = 0
+        self._rebuild_file_counters()
+        self._write_embeddings(np.empty((0, self.embedding_dim), dtype='float32'))
         print(f"Created new FAISS index with dimension {self.embedding_dim}")
         
     def _load_index(self):
         """Load existing index and metadata from disk."""
         self.index = faiss.read_index(str(self.index_path))
-        with open(self.metadata_path, 'rb') as f:
-            self.metadata = pickle.load(f)
+        if isinstance(self.index, faiss.IndexIVF):
+            self.index.nprobe = self.nprobe
+        elif isinstance(self.index, faiss.IndexHNSW):
+            self.index.hnsw.efSearch = self.HNSW_EF_SEARCH
+        self._load_metadata()
+        reconciled = self._reconcile_index()
+        self._rebuild_file_counters()
+        self._load_embeddings()
+        if reconciled:
+            self.save()
         print(f"Loaded existing index with {self.index.ntotal} vectors")
+    
+    def _reconcile_index(self) -> bool:
+        """
+        Bring the index back in line with the metadata after an interrupted save.
+        
+        save() writes metadata before the index, so a crash in between leaves
+        metadata rows the index doesn't have, and search results would map
+        to the wrong rows. The index is rebuilt from the raw embeddings
+        (written on every add); metadata rows without a stored embedding are
+        dropped.
+        
+        Returns:
+            True if the index or metadata had to be changed
+        """
+        num_rows = len(self._texts)
+        if self.index.ntotal == num_rows:
+            return False
+        
+        stored_rows = self._stored_embedding_rows()
+        if stored_rows:
+            rows = min(num_rows, stored_rows)
+            vectors = np.fromfile(self.embeddings_path, dtype='float32',
+                                  count=rows * self.embedding_dim).reshape(rows, self.embedding_dim)
+        else:
+            # Store without raw embeddings: the index is the only source
+            rows = min(num_rows, self.index.ntotal)
+            if isinstance(self.index, faiss.IndexIVF):
+                self.index.make_direct_map()
+            vectors = self.index.reconstruct_n(0, rows)
+        
+        print(f"Index has {self.index.ntotal} vectors but metadata has {num_rows} rows; "
+              f"rebuilding with {rows}")
+        if rows < num_rows:
+            self._filenames = self._filenames[:rows]
+            self._file_types = self._file_types[:rows]
+            self._chunk_idx = self._chunk_idx[:rows]
+            self._texts = self._texts[:rows]
+            self._rewrite_metadata = True
+        self._rebuild_index(vectors)
+        return True
+    
+    def _metadata_parts(self) -> List[Path]:
+        """Return the Parquet metadata part files in write order."""
+        return sorted(self.metadata_dir.glob("part-*.parquet"))
+    
+    def _load_metadata(self):
+        """
+        Load metadata columns from the Parquet parts.
+        
+        Stores written before the switch to Parquet keep metadata in a single
+        pickle; it is converted once and removed.
+        """
+        self._reset_metadata()
+        self._rewrite_metadata = False
+        self._persisted_rows = 0
+        
+        parts = self._metadata_parts()
+        if parts:
+            table = pa.concat_tables([pq.read_table(part) for part in parts])
+            self._filenames = np.array(table.column('filename').to_pylist(), dtype=object)
+            self._file_types = np.array(table.column('file_type').to_pylist(), dtype=object)
+            self._chunk_idx = table.column('chunk_index').to_numpy().astype(np.int32)
+            self._texts = table.column('text').to_pylist()
+            self._persisted_rows = table.num_rows
+        elif self.legacy_metadata_path.exists():
+            # One metadata dict per chunk
+            with open(self.legacy_metadata_path, 'rb') as f:
+                self._append_metadata(pickle.load(f))
+            self._save_metadata()
+            self.legacy_metadata_path.unlink()
+    
+    def _save_metadata(self):
+        """
+        Write metadata rows added since the last save as a new Parquet part.
+        
+        After deletes (or once too many parts accumulate) all rows are
+        rewritten into a single part instead.
+        """
+        parts = self._metadata_parts()
+        if self._rewrite_metadata or len(parts) >= self.MAX_METADATA_PARTS:
+            start = 0
+        else:
+            start = self._persisted_rows
+        
+        if start == len(self._texts) and not self._rewrite_metadata:
+            return
+        
+        table = pa.table({
+            'filename': pa.array(self._filenames[start:].tolist(), type=pa.string()),
+            'file_type': pa.array(self._file_types[start:].tolist(), type=pa.string()),
+            'chunk_index': pa.array(self._chunk_idx[start:], type=pa.int32()),
+            'text': pa.array(self._texts[start:], type=pa.string()),
+        })
+        
+        if start == 0:
+            # Write the compacted part first so a crash never leaves no metadata
+            tmp_path = self.metadata_dir / "compact.tmp"
+            pq.write_table(table, tmp_path)
+            for part in parts:
+                part.unlink()
+            os.replace(tmp_path, self.metadata_dir / "part-000000.parquet")
+        else:
+            pq.write_table(table, self.metadata_dir / f"part-{len(parts):06d}.parquet")
+        
+        self._persisted_rows = len(self._texts)
+        self._rewrite_metadata = False
+    
+    def _reset_metadata(self):
+        """Start with empty metadata columns."""
+        self._filenames = np.empty(0, dtype=object)
+        self._file_types = np.empty(0, dtype=object)
+        self._chunk_idx = np.empty(0, dtype=np.int32)
+        self._texts: List[str] = []
+    
+    def _append_metadata(self, metadata_list: List[Dict]):
+        """Append per-chunk metadata dicts to the metadata columns."""
+        self._filenames = np.concatenate([
+            self._filenames, np.array([m['filename'] for m in metadata_list], dtype=object)
+        ])
+        self._file_types = np.concatenate([
+            self._file_types, np.array([m['file_type'] for m in metadata_list], dtype=object)
+        ])
+        self._chunk_idx = np.concatenate([
+            self._chunk_idx, np.array([m['chunk_index'] for m in metadata_list], dtype=np.int32)
+        ])
+        self._texts.extend(m['text'] for m in metadata_list)
+    
+    def _new_index(self):
+        """
+        Create an empty index of the configured type.
+        
+        - "hnsw": graph index with logarithmic search time and no training,
+          usable up to ~1M vectors before memory becomes the limit.
+        - "ivfpq": until IVF+PQ training (see `_maybe_train_index`), an
+          exhaustive index storing vectors as FP16, which halves size and
+          memory traffic versus FP32 with negligible recall loss on
+          unit-length embeddings.
+        """
+        if self.index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(self.embedding_dim, self.HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = self.HNSW_EF_CONSTRUCTION
+            index.hnsw.efSearch = self.HNSW_EF_SEARCH
+            return index
+        return faiss.IndexScalarQuantizer(
+            self.embedding_dim, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT
+        )
+    
+    def _load_embeddings(self):
+        """
+        Memory-map the stored raw embeddings.
+        
+        Stores created before raw embeddings were persisted only have the
+        index; for those the vectors are recovered from the index once and
+        written out, so later deletes can rebuild without re-embedding.
+        """
+        num_vectors = len(self._texts)
+        stored_rows = self._stored_embedding_rows()
+        
+        if stored_rows >= num_vectors:
+            # Extra rows can only come from an add that never reached save();
+            # drop them so later appends stay aligned with the metadata
+            if stored_rows > num_vectors:
+                row_bytes = self.embedding_dim * np.dtype('float32').itemsize
+                os.truncate(self.embeddings_path, num_vectors * row_bytes)
+            self._embeddings = self._map_embeddings(num_vectors)
+            return
+        
+        print("Recovering raw embeddings from the index...")
+        if isinstance(self.index, faiss.IndexIVF):
+            self.index.make_direct_map()
+        self._write_embeddings(self.index.reconstruct_n(0, self.index.ntotal))
+    
+    def _stored_embedding_rows(self) -> int:
+        """Number of complete rows in the raw embeddings file."""
+        if not self.embeddings_path.exists():
+            return 0
+        row_bytes = self.embedding_dim * np.dtype('float32').itemsize
+        return self.embeddings_path.stat().st_size // row_bytes
+    
+    def _map_embeddings(self, num_vectors: int) -> np.ndarray:
+        """Open the first num_vectors rows of the embeddings file read-only."""
+        if num_vectors == 0:
+            return np.empty((0, self.embedding_dim), dtype='float32')
+        return np.memmap(self.embeddings_path, dtype='float32', mode='r',
+                         shape=(num_vectors, self.embedding_dim))
+    
+    def _append_embeddings(self, embeddings: np.ndarray):
+        """Append rows to the embeddings file without rewriting existing ones."""
+        num_vectors = len(self._embeddings) + len(embeddings)
+        self._embeddings = None  # Release the old mapping before growing the file
+        with open(self.embeddings_path, 'ab') as f:
+            f.write(np.ascontiguousarray(embeddings, dtype='float32').tobytes())
+        self._embeddings = self._map_embeddings(num_vectors)
+    
+    def _write_embeddings(self, embeddings: np.ndarray):
+        """Replace the embeddings file with exactly the given rows."""
+        embeddings = np.ascontiguousarray(embeddings, dtype='float32')
+        self._embeddings = None
+        tmp_path = self.embeddings_path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(embeddings.tobytes())
+        os.replace(tmp_path, self.embeddings_path)
+        self._embeddings = self._map_embeddings(len(embeddings))
+    
+    def _rebuild_file_counters(self):
+        """
+        Recompute per-file chunk counts and file types from metadata.
+        
+        These are kept up to date incrementally by add/delete so that file
+        listings don't have to scan every chunk's metadata.
+        """
+        # One vectorized pass over the filename column instead of a Python
+        # loop over every chunk
+        filenames, first_ids, counts = np.unique(
+            self._filenames, return_index=True, return_counts=True
+        )
+        # filename -> [file_type, num_chunks]
+        self._file_stats: Dict[str, List] = {
+            filename: [file_type, count]
+            for filename, file_type, count in zip(
+                filenames.tolist(), self._file_types[first_ids].tolist(), counts.tolist()
+            )
+        }
+    
+    def _count_metadata(self, filenames, file_types):
+        """Add chunks with the given filenames/file types to the per-file counters."""
+        for filename, file_type in zip(filenames, file_types):
+            self._file_stats.setdefault(filename, [file_type, 0])[1] += 1
+    
+    def _maybe_train_index(self):
+        """
+        Replace the flat index with a trained IVF+PQ index once large enough.
+        
+        IVF limits each query to `nprobe` of the coarse cells instead of
+        scanning every vector, and PQ compresses the stored codes ~32x.
+        Training needs a representative sample, so it only happens once
+        `train_threshold` vectors have accumulated; they are all used for
+        training and then re-added to the new index.
+        """
+        if (self.index_type != "ivfpq" or isinstance(self.index, faiss.IndexIVF)
+                or self.index.ntotal < self.train_threshold):
+            return
+        
+        print(f"Training IVF+PQ index on {self.index.ntotal} vectors...")
+        vectors = np.asarray(self._embeddings)
+        
+        factory = f"IVF{self.IVF_NLIST},PQ{self.embedding_dim // self.PQ_DIMS_PER_CODE}"
+        index = faiss.index_factory(self.embedding_dim, factory, faiss.METRIC_INNER_PRODUCT)
+        index.train(vectors)
+        index.add(vectors)
+        index.nprobe = self.nprobe
+        self.index = index
+    
+    def _rebuild_index(self, vectors: np.ndarray):
+        """
+        Replace the index contents with exactly the given vectors.
+        
+        A trained IVF+PQ index keeps its training when enough vectors
+        remain; otherwise a fresh index of the configured type is built.
+        """
+        if isinstance(self.index, faiss.IndexIVF) and len(vectors) >= self.train_threshold:
+            self.index.reset()
+        else:
+            self.index = self._new_index()
+        self.index.add(np.ascontiguousarray(vectors, dtype='float32'))
+    
+    def _similarity_scores(self, distances: np.ndarray) -> np.ndarray:
+        """
+        Convert raw FAISS distances to cosine similarity.
+        
+        Inner-product indexes already return cosine similarity for normalized
+        vectors. Indexes persisted before the switch to inner product use
+        squared L2 distance (0 to 4), where similarity = 1 - (distance / 2).
+        """
+        if self.index.metric_type == faiss.METRIC_L2:
+            return 1.0 - (distances / 2.0)
+        return distances
+        
+    def _search_params(self, selector):
+        """Build search parameters restricting the search to selected ids."""
+        if isinstance(self.index, faiss.IndexIVF):
+            return faiss.SearchParametersIVF(sel=selector, nprobe=self.index.nprobe)
+        if isinstance(self.index, faiss.IndexHNSW):
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=self.index.hnsw.efSearch)
+        return faiss.SearchParameters(sel=selector)
         
     def save(self):
         """Persist index and metadata to disk."""
-        faiss.write_index(self.index, str(self.index_path))
-        with open(self.metadata_path, 'wb') as f:
-            pickle.dump(self.metadata, f)
+        with self._lock:
+            self._save_metadata()
+            faiss.write_index(self.index, str(self.index_path))
+            self._pending_vectors = 0
         print(f"Saved index with {self.index.ntotal} vectors")
+    
+    def flush(self):
+        """Write pending adds to disk, if there are any."""
+        with self._lock:
+            if self._pending_vectors:
+                self.save()
+    
+    async def run_periodic_flush(self, interval: float = 5.0):
+        """
+        Flush pending adds every `interval` seconds until cancelled.
+        
+        Started as a background task by the application, so uploads never
+        pay for writing the index to disk themselves.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            if self._pending_vectors:
+                # A failed flush is retried on the next tick (the pending
+                # count is kept) instead of ending the task
+                try:
+                    await asyncio.to_thread(self.flush)
+                except Exception as e:
+                    print(f"Periodic flush failed: {e}")
         
     def add_vectors(self, embeddings: np.ndarray, metadata_list: List[Dict]):
         """
         Add vectors to the index with associated metadata.
         
+        Changes are searchable immediately but only written to disk by
+        `flush()`, which runs here once `FLUSH_AFTER_VECTORS` are pending.
+        
         Args:
             embeddings: Array of shape (n, embedding_dim)
             metadata_list: List of metadata dicts for each vector
@@ -83,20 +463,37 @@ class FAISSVectorStore:
         if embeddings.shape[0] != len(metadata_list):
             raise ValueError("Number of embeddings must match metadata list length")
             
-        # Add to FAISS index
-        self.index.add(embeddings.astype('float32'))
-        
-        # Store metadata
-        self.metadata.extend(metadata_list)
-        
-        # Persist changes
-        self.save()
+        with self._lock:
+            # Add to FAISS index
+            embeddings = embeddings.astype('float32')
+            self.index.add(embeddings)
+            self._append_embeddings(embeddings)
+            
+            # Store metadata
+            self._append_metadata(metadata_list)
+            self._count_metadata(
+                (m['filename'] for m in metadata_list),
+                (m['file_type'] for m in metadata_list),
+            )
+            
+            # Switch to IVF+PQ once enough vectors are available for training
+            self._maybe_train_index()
+            
+            # Persist changes once enough have accumulated
+            self._pending_vectors += len(embeddings)
+            if self._pending_vectors >= self.FLUSH_AFTER_VECTORS:
+                self.flush()
         
     def search(self, query_embedding: np.ndarray, top_k: int = 5, 
                filter_filenames: List[str] = None) -> List[Dict]:
         """
         Search for most similar vectors.
         
+        Holds the store lock, so a search never sees an index and metadata
+        that a concurrent add, retrain or delete is part way through
+        changing. Call it from a worker thread inside the event loop, since
+        it waits for any flush in progress.
+        
         Args:
             query_embedding: Query vector of shape (embedding_dim,)
             top_k: Number of results to return
@@ -105,82 +502,125 @@ class FAISSVectorStore:
         Returns:
             List of dicts with chunk text, metadata, and similarity score
         """
-        if self.index.ntotal == 0:
-            return []
-        
-        # Reshape query for FAISS
-        query_vector = query_embedding.reshape(1, -1).astype('float32')
-        
-        # Search (returns distances and indices)
-        # Lower L2 distance = more similar (since vectors are normalized)
-        distances, indices = self.index.search(query_vector, min(top_k * 2, self.index.ntotal))
-        
-        results = []
-        for dist, idx in zip(distances[0], indices[0]):
-            if idx == -1:  # FAISS returns -1 for empty slots
-                continue
-                
-            metadata = self.metadata[idx]
+        with self._lock:
+            if self.index.ntotal == 0:
+                return []
             
-            # Apply filename filter if specified
-            if filter_filenames and metadata['filename'] not in filter_filenames:
-                continue
+            # Reshape query for FAISS
+            query_vector = query_embedding.reshape(1, -1).astype('float32')
             
-            # Convert L2 distance to similarity score (0-1 range)
-            # Since vectors are normalized, L2 distance ranges from 0 to 2
-            # Similarity = 1 - (distance / 2)
-            similarity_score = 1.0 - (float(dist) / 2.0)
+            k = min(top_k, self.index.ntotal)
+            params = None
+            if filter_filenames:
+                allowed_ids = np.flatnonzero(
+                    np.isin(self._filenames, np.array(filter_filenames, dtype=object))
+                ).astype('int64')
+                if len(allowed_ids) == 0:
+                    return []
+                
+                # An IVF index only applies the selector inside the nprobe
+                # probed cells, which may hold none of the selected vectors,
+                # so score the selected raw embeddings exactly instead. Small
+                # selections are scored exactly for any index type.
+                if (isinstance(self.index, faiss.IndexIVF)
+                        or len(allowed_ids) <= self.EXACT_FILTER_MAX_VECTORS):
+                    return self._exact_search(query_vector[0], allowed_ids, top_k)
+                
+                # Apply the filename filter inside FAISS, so non-matching
+                # vectors are skipped during the search rather than
+                # over-fetched and discarded
+                k = min(top_k, len(allowed_ids))
+                selector = faiss.IDSelectorBatch(len(allowed_ids), faiss.swig_ptr(allowed_ids))
+                params = self._search_params(selector)
             
-            results.append({
-                'text': metadata['text'],
-                'filename': metadata['filename'],
-                'file_type': metadata['file_type'],
-                'chunk_index': metadata['chunk_index'],
-                'score': similarity_score
-            })
+            # Search (returns distances and indices)
+            # Higher inner product = more similar (since vectors are normalized)
+            distances, indices = self.index.search(query_vector, k, params=params)
             
-            if len(results) >= top_k:
-                break
-                
-        return results
+            # FAISS returns -1 for empty slots
+            valid = indices[0] >= 0
+            return self._search_results(
+                indices[0][valid], self._similarity_scores(distances[0][valid])
+            )
+    
+    def _exact_search(self, query_vector: np.ndarray, ids: np.ndarray,
+                      top_k: int) -> List[Dict]:
+        """
+        Score the raw embeddings of the given ids against the query exactly.
+        
+        Embeddings are normalized, so the inner product is the cosine
+        similarity, the same score the index reports.
+        """
+        scores = np.asarray(self._embeddings[ids]) @ query_vector
+        if len(ids) > top_k:
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            top = np.arange(len(ids))
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return self._search_results(ids[top], scores[top])
+    
+    def _search_results(self, ids: np.ndarray, scores: np.ndarray) -> List[Dict]:
+        """Build result dicts for the given vector ids, best first."""
+        filenames = self._filenames[ids]
+        file_types = self._file_types[ids]
+        chunk_indices = self._chunk_idx[ids].tolist()
+        
+        return [
+            {
+                'text': self._texts[idx],
+                'filename': filenames[i],
+                'file_type': file_types[i],
+                'chunk_index': chunk_indices[i],
+                'score': score
+            }
+            for i, (idx, score) in enumerate(zip(ids.tolist(), scores.tolist()))
+        ]
     
     def get_all_filenames(self) -> List[str]:
         """Return list of unique filenames in the index."""
-        return list(set(meta['filename'] for meta in self.metadata))
+        # dict.copy() is atomic, so no lock (and no wait on a flush) is needed
+        # to iterate safely while an add runs on another thread
+        return list(self._file_stats.copy())
+    
+    def get_file_stats(self) -> List[Tuple[str, str, int]]:
+        """Return (filename, file_type, num_chunks) for every indexed file."""
+        return [
+            (filename, file_type, count)
+            for filename, (file_type, count) in self._file_stats.copy().items()
+        ]
     
     def delete_by_filename(self, filename: str):
         """
         Remove all vectors associated with a filename.
         
-        Note: FAISS doesn't support efficient deletion, so we rebuild the index.
-        This is acceptable for small datasets typical of local RAG systems.
+        Note: FAISS doesn't support efficient deletion, so we rebuild the index
+        from the stored raw embeddings of the remaining vectors (see
+        `_rebuild_index`).
         """
-        # Filter out metadata for the file
-        indices_to_keep = [i for i, meta in enumerate(self.metadata) 
-                          if meta['filename'] != filename]
-        
-        if len(indices_to_keep) == len(self.metadata):
-            print(f"No vectors found for {filename}")
-            return
+        with self._lock:
+            keep_mask = self._filenames != filename
             
-        # Rebuild index with remaining vectors
-        new_metadata = [self.metadata[i] for i in indices_to_keep]
-        
-        # Extract embeddings for remaining vectors
-        # This requires re-embedding, which is a limitation
-        # Alternative: store embeddings separately, but increases storage
-        print(f"Rebuilding index after deleting {filename}...")
-        
-        self.metadata = new_metadata
-        self._create_new_index()
-        
-        # Note: This method is incomplete without stored embeddings
-        # For a college project, we can document this as a limitation
-        # In production, you'd store embeddings separately or use a different vector DB
-        
-        self.save()
+            if keep_mask.all():
+                print(f"No vectors found for {filename}")
+                return
+            
+            print(f"Rebuilding index after deleting {filename}...")
+            
+            kept_embeddings = np.asarray(self._embeddings)[keep_mask]
+            self._filenames = self._filenames[keep_mask]
+            self._file_types = self._file_types[keep_mask]
+            self._chunk_idx = self._chunk_idx[keep_mask]
+            self._texts = [text for text, keep in zip(self._texts, keep_mask) if keep]
+            self._rewrite_metadata = True
+            self._file_stats.pop(filename, None)
+            
+            self._rebuild_index(kept_embeddings)
+            self._write_embeddings(kept_embeddings)
+            
+            self.save()
     
     def clear(self):
         """Clear all vectors and metadata."""
-        self._create_new_index()
-        self.save()
+        with self._lock:
+            self._create_new_index()
+            self.save()
@@ -0,0 +1,61 @@
+"""
+Small in-memory caching helpers.
+
+Used to skip repeated expensive work (embedding forward passes, LLM calls)
+for inputs that have been seen recently.
+"""
+
+from collections import OrderedDict
+import hashlib
+import threading
+from typing import Any, Hashable, Optional
+
+
+def fingerprint(*parts: str) -> str:
+    """
+    Build a stable cache key from several string parts.
+
+    Parts are joined with a separator and hashed, so keys stay small even
+    for long questions or prompts.
+    """
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache with a fixed number of entries.
+
+    FastAPI runs sync endpoints in a thread pool, so all access goes
+    through a lock. A maxsize of 0 disables caching entirely.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value (marking it recently used) or None."""
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry if full."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
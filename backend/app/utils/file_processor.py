@@ -8,26 +8,672 @@ Handles extraction of text from:
 - DOCX files (optional)
 """
 
-import PyPDF2
-import markdown
+import asyncio
+import base64
+import codecs
+import functools
+import hashlib
+import io
+import mmap
+import os
+import string
+import threading
+import unicodedata
+import zipfile
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from itertools import chain, repeat
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
-try:
-    from docx import Document
-    DOCX_AVAILABLE = True
-except ImportError:
-    DOCX_AVAILABLE = False
+# Parser libraries are imported on first use rather than at module import,
+# so a worker that only ever handles one format doesn't pay the import time
+# and memory of the others.
+
+
+@functools.lru_cache(maxsize=None)
+def _import_pymupdf():
+    """
+    Import PyMuPDF on first use, or return None if it isn't installed.
+    
+    PyMuPDF parses PDFs in C (MuPDF), typically 10x+ faster than PyPDF2.
+    It is AGPL-licensed, so PyPDF2 remains as a pure-Python fallback.
+    """
+    try:
+        import fitz
+    except ImportError:
+        return None
+    return fitz
+
+
+@functools.lru_cache(maxsize=None)
+def _markdown_to_text() -> Optional[Callable[[str], str]]:
+    """
+    Build the mistune Markdown-to-plain-text converter on first use.
+    
+    Built once and reused; constructing the parser per file is a large
+    share of the cost for small documents. Returns None if mistune isn't
+    installed.
+    """
+    try:
+        import mistune
+    except ImportError:
+        return None
+    
+    class PlainTextRenderer(mistune.HTMLRenderer):
+        """
+        Render Markdown straight to plain text.
+        
+        Emits the text content of each element (no markup, no HTML escaping)
+        with blocks separated by blank lines, so no intermediate HTML has to
+        be generated and stripped again.
+        """
+        
+        def text(self, text):
+            return text
+        
+        def emphasis(self, text):
+            return text
+        
+        def strong(self, text):
+            return text
+        
+        def link(self, text, url, title=None):
+            return text
+        
+        def image(self, text, url, title=None):
+            return text
+        
+        def codespan(self, text):
+            return text
+        
+        def linebreak(self):
+            return '\n'
+        
+        def softbreak(self):
+            return '\n'
+        
+        def inline_html(self, html):
+            return ''
+        
+        def paragraph(self, text):
+            return text + '\n\n'
+        
+        def heading(self, text, level, **attrs):
+            return text + '\n\n'
+        
+        def blank_line(self):
+            return ''
+        
+        def thematic_break(self):
+            return ''
+        
+        def block_text(self, text):
+            return text + '\n'
+        
+        def block_code(self, code, info=None):
+            return code + '\n\n'
+        
+        def block_quote(self, text):
+            return text
+        
+        def block_html(self, html):
+            return ''
+        
+        def block_error(self, text):
+            return text
+        
+        def list(self, text, ordered, **attrs):
+            return text + '\n'
+        
+        def list_item(self, text):
+            return text.rstrip('\n') + '\n'
+    
+    return mistune.create_markdown(renderer=PlainTextRenderer())
+
+
+# Characters that can start inline Markdown markup; lines without any of
+# them are passed through untouched
+_MARKDOWN_INLINE_CHARS = frozenset('*_`[]!<\\')
+
+# Only ASCII punctuation can be backslash-escaped (CommonMark 2.4); any
+# other backslash is a literal character
+_MARKDOWN_ESCAPABLE = frozenset(string.punctuation)
+
+
+def _is_punctuation(char: str) -> bool:
+    """Unicode punctuation or symbol, as used by CommonMark's flanking rules."""
+    return unicodedata.category(char)[0] in 'PS'
+
+
+def _emphasis_flanking(line: str, start: int, end: int) -> Tuple[bool, bool]:
+    """
+    Whether the run of '*' or '_' at line[start:end] can open and/or close
+    emphasis, following CommonMark's left-/right-flanking rules.
+    
+    A run surrounded by whitespace (as in `2 * 3`) can do neither, and '_'
+    inside a word (snake_case) can neither open nor close.
+    """
+    before = line[start - 1] if start > 0 else ' '
+    after = line[end] if end < len(line) else ' '
+    left_flanking = not after.isspace() and (
+        not _is_punctuation(after) or before.isspace() or _is_punctuation(before))
+    right_flanking = not before.isspace() and (
+        not _is_punctuation(before) or after.isspace() or _is_punctuation(after))
+    
+    if line[start] == '*':
+        return left_flanking, right_flanking
+    return (left_flanking and (not right_flanking or _is_punctuation(before)),
+            right_flanking and (not left_flanking or _is_punctuation(after)))
+
+
+def _link_end(line: str, start: int) -> int:
+    """
+    End (exclusive) of a link starting with '[' at line[start], if its text
+    is followed by an inline "(url)" or reference "[label]" target; else -1.
+    """
+    close = line.find(']', start + 1)
+    if close < 0 or close + 1 >= len(line) or line[close + 1] not in '([':
+        return -1
+    end = line.find(')' if line[close + 1] == '(' else ']', close + 2)
+    return end + 1 if end >= 0 else -1
+
+
+def _autolink_end(line: str, start: int) -> int:
+    """
+    End (exclusive) of a CommonMark autolink (`<scheme:...>` or
+    `<user@host>`) starting at line[start], or -1.
+    """
+    end = line.find('>', start + 1)
+    if end < 0:
+        return -1
+    target = line[start + 1:end]
+    if not target or '<' in target or any(c.isspace() for c in target):
+        return -1
+    
+    scheme, colon, _ = target.partition(':')
+    if (colon and 2 <= len(scheme) <= 32 and scheme[0].isascii() and scheme[0].isalpha()
+            and all(c.isascii() and (c.isalnum() or c in '+.-') for c in scheme)):
+        return end + 1
+    
+    user, at, host = target.partition('@')
+    if at and user and '.' in host and '@' not in host:
+        return end + 1
+    return -1
+
+
+def _html_tag_end(line: str, start: int) -> int:
+    """
+    End (exclusive) of a well-formed HTML tag or comment starting at
+    line[start], or -1.
+    
+    The tag name must follow '<' (or '</') directly, and every attribute
+    needs a value, so prose like `x<y and y>z` is not mistaken for a tag.
+    """
+    n = len(line)
+    if line.startswith('<!--', start):
+        end = line.find('-->', start + 4)
+        return end + 3 if end >= 0 else -1
+    
+    i = start + 1
+    closing = line.startswith('/', i)
+    if closing:
+        i += 1
+    if i >= n or not (line[i].isascii() and line[i].isalpha()):
+        return -1
+    while i < n and line[i].isascii() and (line[i].isalnum() or line[i] == '-'):
+        i += 1
+    
+    while True:
+        j = i
+        while j < n and line[j] in ' \t':
+            j += 1
+        if line.startswith('>', j):
+            return j + 1
+        if not closing and line.startswith('/>', j):
+            return j + 2
+        if closing or j == i or j >= n:
+            return -1  # closing tags take no attributes; attributes need a space
+        
+        # Attribute: name=value, name="value" or name='value'
+        k = j
+        if not (line[k].isalpha() or line[k] in '_:'):
+            return -1
+        while k < n and (line[k].isalnum() or line[k] in '_.:-'):
+            k += 1
+        if not line.startswith('=', k):
+            return -1
+        k += 1
+        if k < n and line[k] in '"\'':
+            quote = line.find(line[k], k + 1)
+            if quote < 0:
+                return -1
+            i = quote + 1
+        else:
+            value = k
+            while k < n and line[k] not in ' \t"\'=<>`':
+                k += 1
+            if k == value:
+                return -1
+            i = k
+
+
+def _strip_inline_markdown(line: str) -> str:
+    """
+    Remove inline Markdown markup from one line in a single scan.
+    
+    Emphasis delimiters are dropped when an opener pairs with a closer
+    (literal '*' and '_', e.g. `2 * 3`, `5*3` or snake_case, are kept).
+    Code spans keep their content, links and images followed by a target
+    are reduced to their text, autolinks to their URL, well-formed HTML
+    tags and comments are dropped, and backslash escapes of ASCII
+    punctuation are resolved. Anything else (`x<y`, `arr[i]`) is kept.
+    """
+    if _MARKDOWN_INLINE_CHARS.isdisjoint(line):
+        return line
+    
+    out = []
+    delimiters = []  # (index in out, char, can_open, can_close)
+    i, n = 0, len(line)
+    while i < n:
+        char = line[i]
+        if char == '\\' and i + 1 < n and line[i + 1] in _MARKDOWN_ESCAPABLE:
+            out.append(line[i + 1])
+            i += 2
+        elif char == '`':
+            # Code span: copy the content up to the matching backtick run
+            run = i
+            while run < n and line[run] == '`':
+                run += 1
+            fence = line[i:run]
+            end = line.find(fence, run)
+            if end < 0:
+                out.append(fence)
+                i = run
+            else:
+                out.append(line[run:end])
+                i = end + len(fence)
+        elif char in '*_':
+            run = i
+            while run < n and line[run] == char:
+                run += 1
+            can_open, can_close = _emphasis_flanking(line, i, run)
+            if can_open or can_close:
+                delimiters.append((len(out), char, can_open, can_close))
+            out.append(line[i:run])
+            i = run
+        elif char == '!' and line.startswith('[', i + 1) and _link_end(line, i + 1) >= 0:
+            i += 1  # image: keep the alt text like a link's text
+        elif char == '[' and _link_end(line, i) >= 0:
+            # Only "[text](url)" and "[text][label]"; other brackets are text
+            close = line.find(']', i + 1)
+            out.append(_strip_inline_markdown(line[i + 1:close]))
+            i = _link_end(line, i)
+        elif char == '<':
+            end = _autolink_end(line, i)
+            if end >= 0:
+                out.append(line[i + 1:end - 1])
+                i = end
+                continue
+            end = _html_tag_end(line, i)
+            if end >= 0:
+                i = end
+            else:
+                out.append(char)
+                i += 1
+        else:
+            out.append(char)
+            i += 1
+    
+    # Pair each closer with the nearest open delimiter of the same char;
+    # only paired runs are removed, unmatched ones stay literal
+    openers = []  # (index in out, char, run length, can_close)
+    for index, char, can_open, can_close in delimiters:
+        length = len(out[index])
+        if can_close:
+            match = next((k for k in range(len(openers) - 1, -1, -1)
+                          if openers[k][1] == char
+                          and not _breaks_rule_of_three(openers[k], length, can_open)), None)
+            if match is not None:
+                out[openers[match][0]] = ''
+                out[index] = ''
+                del openers[match:]
+                continue
+        if can_open:
+            openers.append((index, char, length, can_close))
+    return ''.join(out)
+
+
+def _breaks_rule_of_three(opener: Tuple[int, str, int, bool], closer_length: int,
+                          closer_can_open: bool) -> bool:
+    """
+    CommonMark's "rule of 3": if either run can both open and close, the
+    runs can't pair when their combined length is a multiple of 3 unless
+    both lengths are (so `5*3=15, x**2` stays literal).
+    """
+    _, _, opener_length, opener_can_close = opener
+    if not (opener_can_close or closer_can_open):
+        return False
+    return ((opener_length + closer_length) % 3 == 0
+            and not (opener_length % 3 == 0 and closer_length % 3 == 0))
+
+
+def _strip_markdown_block(line: str) -> Optional[str]:
+    """
+    Remove block-level Markdown markers (quotes, headings, list bullets)
+    from the start of a line. Returns None for thematic breaks and setext
+    heading underlines.
+    """
+    line = line.lstrip()
+    while line.startswith('>'):
+        line = line[1:].lstrip()
+    
+    if line.startswith('#'):
+        level = len(line) - len(line.lstrip('#'))
+        if level <= 6 and (len(line) == level or line[level] in ' \t'):
+            return line[level:].strip().rstrip('#').rstrip()
+    
+    if len(line) >= 3 and line[0] in '-*_=' and not line.replace(line[0], '').replace(' ', ''):
+        return None
+    
+    if line[:1] in '-*+' and line[1:2] in (' ', '\t'):
+        return line[2:].lstrip()
+    
+    digits = len(line) - len(line.lstrip('0123456789'))
+    if (0 < digits <= 9 and line[digits:digits + 1] in ('.', ')')
+            and line[digits + 1:digits + 2] in (' ', '\t')):
+        return line[digits + 2:].lstrip()
+    
+    return line
+
+
+def _markdown_to_plain_text(md_content: str) -> str:
+    """
+    Convert Markdown to plain text in one pass over its lines.
+    
+    Used when mistune isn't installed. Goes straight to text (no HTML is
+    generated and stripped again): fenced code blocks are kept verbatim
+    without their fences, block markers are removed from each line, then
+    inline markup.
+    """
+    out = []
+    fence = None
+    for line in md_content.splitlines():
+        stripped = line.lstrip()
+        if fence is not None:
+            if stripped.startswith(fence):
+                fence = None
+            else:
+                out.append(line)
+            continue
+        if stripped.startswith(('```', '~~~')):
+            fence = stripped[:3]
+            continue
+        
+        block = _strip_markdown_block(stripped)
+        if block is not None:
+            out.append(_strip_inline_markdown(block))
+    return '\n'.join(out)
+
+
+# Persistent cache of extracted text, keyed by file content. Bump
+# EXTRACT_CACHE_VERSION whenever an extractor's output changes. Once the
+# directory grows past EXTRACT_CACHE_MAX_BYTES, the least recently used
+# entries are evicted.
+EXTRACT_CACHE_DIR = Path(os.environ.get('RAG_EXTRACT_CACHE_DIR', Path.home() / '.cache' / 'rag'))
+EXTRACT_CACHE_VERSION = 9
+EXTRACT_CACHE_MAX_BYTES = int(os.environ.get('RAG_EXTRACT_CACHE_MAX_BYTES', 1024 * 1024 * 1024))
+
+# OCR fallback for scanned PDFs, disabled unless RAG_OCR_ENDPOINT is set to
+# an OpenAI-compatible chat completions URL serving a vision model, e.g.
+# dots.ocr on a local vLLM server (http://localhost:8001/v1/chat/completions).
+# It is only used for PDFs averaging fewer than OCR_MIN_PAGE_CHARS
+# characters per page, so text-first documents never pay for it.
+OCR_ENDPOINT = os.environ.get('RAG_OCR_ENDPOINT')
+OCR_MODEL = os.environ.get('RAG_OCR_MODEL', 'rednote-hilab/dots.ocr')
+OCR_MIN_PAGE_CHARS = 50
+OCR_BATCH_SIZE = 8
+OCR_DPI = 300
+OCR_MAX_TOKENS = 3072
+OCR_PROMPT = "Extract all text from this document page, in reading order."
+
+# Below this many parts, list + join is fastest; above it, parts are
+# written into a StringIO as they are produced instead of being collected
+STREAM_JOIN_MIN_PARTS = 16
+
+
+def _join_nonblank(texts: Iterable[str], count: Optional[int] = None) -> str:
+    """
+    Join non-blank texts (pages, paragraphs) with blank lines in between.
+    
+    Args:
+        texts: Texts in document order; consumed lazily
+        count: Number of texts, used to pick the joining strategy; None if
+            unknown, in which case texts are streamed into the buffer
+    """
+    # isspace() tests for blank parts without allocating a stripped copy
+    if count is not None and count < STREAM_JOIN_MIN_PARTS:
+        return '\n\n'.join(text for text in texts if text and not text.isspace())
+    
+    buffer = io.StringIO()
+    for text in texts:
+        if text and not text.isspace():
+            if buffer.tell():
+                buffer.write('\n\n')
+            buffer.write(text)
+    return buffer.getvalue()
+
+
+# Byte order marks and the codec that decodes (and drops) each. UTF-32 LE
+# must come before UTF-16 LE, whose BOM is a prefix of it.
+_BOM_ENCODINGS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+
+def _sniff_encoding(head: bytes) -> str:
+    """Pick the codec for a text file from its first bytes (UTF-8 without a BOM)."""
+    for bom, encoding in _BOM_ENCODINGS:
+        if head.startswith(bom):
+            return encoding
+    return 'utf-8'
+
+
+def _ocr_image(png: bytes) -> Optional[str]:
+    """
+    Transcribe one rendered page with the OCR model.
+    
+    Returns:
+        Page text, or None if the OCR service is unavailable
+    """
+    import requests
+    
+    image_url = "data:image/png;base64," + base64.b64encode(png).decode('ascii')
+    try:
+        response = requests.post(
+            OCR_ENDPOINT,
+            json={
+                "model": OCR_MODEL,
+                "max_tokens": OCR_MAX_TOKENS,
+                "temperature": 0.0,
+                "messages": [{
+                    "role": "user",
+                    "content": [
+                        {"type": "image_url", "image_url": {"url": image_url}},
+                        {"type": "text", "text": OCR_PROMPT},
+                    ],
+                }],
+            },
+            timeout=300
+        )
+        
+        if response.status_code == 200:
+            return response.json()['choices'][0]['message']['content'] or ''
+        print(f"OCR request failed with status {response.status_code}")
+        return None
+    
+    except requests.exceptions.RequestException as e:
+        print(f"OCR request failed: {e}")
+        return None
+
+
+def _ocr_pdf_pages(file_path: str, page_numbers: List[int]) -> Dict[int, str]:
+    """
+    Render PDF pages and transcribe them with the OCR model.
+    
+    Pages are rendered OCR_BATCH_SIZE at a time and each batch is sent as
+    concurrent requests, which the inference server batches on the GPU;
+    only one batch of page images is held in memory at once.
+    
+    Returns:
+        Text per page number, for the pages that were transcribed
+    """
+    results = {}
+    with _import_pymupdf().open(file_path) as doc, \
+            ThreadPoolExecutor(max_workers=OCR_BATCH_SIZE) as executor:
+        for start in range(0, len(page_numbers), OCR_BATCH_SIZE):
+            batch = page_numbers[start:start + OCR_BATCH_SIZE]
+            images = [doc[page_num].get_pixmap(dpi=OCR_DPI).tobytes('png') for page_num in batch]
+            for page_num, text in zip(batch, executor.map(_ocr_image, images)):
+                if text is not None:
+                    results[page_num] = text
+    return results
+
+
+class IncompleteExtraction(Exception):
+    """
+    Raised by an extractor whose output is missing content because of a
+    transient failure (e.g. the OCR service being down).
+    
+    Carries the partial text. Raising instead of returning it keeps the
+    result out of the in-process and on-disk caches, so a later extraction
+    retries; `FileProcessor.extract_text` catches it and returns the text.
+    """
+    
+    def __init__(self, text: str, reason: str):
+        super().__init__(reason)
+        self.text = text
+        self.reason = reason
+
+
+# Large PDFs are split across a process pool only for synchronous callers
+# of `extract_text`. Threads that set `disabled` parse pages in-process:
+# `extract_many` workers, which already run one file per CPU, and the
+# request path (`extract_text_async`), where up to MAX_CONCURRENT_EXTRACTIONS
+# run at once and forking the server from a worker thread is unsafe.
+_pdf_page_parallelism = threading.local()
+
+
+def _disable_pdf_page_parallelism():
+    """
+    Parse PDF pages in-process in the calling thread.
+    
+    Also the process pool initializer for `FileProcessor.extract_many`
+    workers, whose tasks run in the same (main) thread.
+    """
+    _pdf_page_parallelism.disabled = True
+
+
+def _extract_text_in_process(file_path: str) -> str:
+    """`FileProcessor.extract_text` without page-level PDF parallelism."""
+    _disable_pdf_page_parallelism()
+    return FileProcessor.extract_text(file_path)
+
+
+# Pages with less extractable text than this are treated as empty
+# (scanned or image-only) and skipped
+MIN_PAGE_TEXT_CHARS = 3
+
+
+def _pdf_page_text(page) -> str:
+    """
+    Extract the text of one PyMuPDF page, or '' for an empty page.
+    
+    Reads the page's text blocks (type 0; image blocks are type 1) so
+    image-only and whitespace-only pages are detected from the block list
+    without a second extraction pass.
+    
+    Flags are limited to what text extraction needs: no image blocks (so
+    images aren't decoded), no ligature or whitespace preservation, and
+    words hyphenated across lines are joined back together. Text outside
+    the page's mediabox is ignored.
+    """
+    fitz = _import_pymupdf()
+    flags = fitz.TEXT_DEHYPHENATE | fitz.TEXT_MEDIABOX_CLIP
+    texts = [block[4] for block in page.get_text("blocks", flags=flags) if block[6] == 0]
+    if sum(len(text.strip()) for text in texts) < MIN_PAGE_TEXT_CHARS:
+        return ''
+    return ''.join(texts)
+
+
+def _extract_pdf_page_range(file_path: str, start: int, stop: int) -> List[str]:
+    """
+    Extract page texts for pages [start, stop) with PyMuPDF.
+    
+    Module-level so it can run in a worker process; each worker opens the
+    document itself, since PyMuPDF documents can't be shared across processes.
+    """
+    with _import_pymupdf().open(file_path) as doc:
+        return [_pdf_page_text(doc[page_num]) for page_num in range(start, stop)]
 
 
 class FileProcessor:
     """Extract text from various document formats."""
     
+    # PDFs with fewer pages than this are parsed in-process; for larger
+    # ones, synchronous `extract_text` callers split pages across worker
+    # processes (at least this many pages per worker, so process startup
+    # is amortized)
+    PDF_PARALLEL_MIN_PAGES = 8
+    
+    # Max extractions running at once via `extract_text_async`; further
+    # callers wait, so a burst of uploads can't oversubscribe the CPU
+    MAX_CONCURRENT_EXTRACTIONS = os.cpu_count() or 4
+    
+    # Default cap on input bytes being extracted at once by `extract_many`
+    MAX_BYTES_IN_FLIGHT = 256 * 1024 * 1024
+    
+    # Text files larger than this are decoded straight from a memory map
+    # instead of being read into an intermediate buffer first; below it,
+    # setting up the mapping costs more than the copy it saves
+    MMAP_MIN_BYTES = 64 * 1024
+    _extract_semaphore: Optional[asyncio.Semaphore] = None
+    
+    @staticmethod
+    async def extract_text_async(file_path: str) -> str:
+        """
+        Extract text without blocking the event loop.
+        
+        Parsing runs in a worker thread, so disk I/O and parsing of one file
+        overlap with other requests. Concurrency is capped by a semaphore
+        shared by all callers (`MAX_CONCURRENT_EXTRACTIONS`), and each file
+        is parsed in that thread only (no per-PDF process pool).
+        
+        Args:
+            file_path: Path to the file
+            
+        Returns:
+            Extracted text content
+        """
+        if FileProcessor._extract_semaphore is None:
+            FileProcessor._extract_semaphore = asyncio.Semaphore(
+                FileProcessor.MAX_CONCURRENT_EXTRACTIONS
+            )
+        async with FileProcessor._extract_semaphore:
+            return await asyncio.to_thread(_extract_text_in_process, file_path)
+    
     @staticmethod
     def extract_text(file_path: str) -> str:
         """
         Extract text from a file based on its extension.
         
+        Results are cached in-process by (path, size, mtime) and on disk by
+        file content, so re-ingesting an unchanged corpus skips parsing.
+        
         Args:
             file_path: Path to the file
             
@@ -37,42 +683,182 @@ class FileProcessor:
         Raises:
             ValueError: If file format is unsupported
         """
-        path = Path(file_path)
-        extension = path.suffix.lower()
-        
-        if extension == '.pdf':
-            return FileProcessor._extract_pdf(file_path)
-        elif extension == '.txt':
-            return FileProcessor._extract_txt(file_path)
-        elif extension in ['.md', '.markdown']:
-            return FileProcessor._extract_markdown(file_path)
-        elif extension == '.docx':
-            if not DOCX_AVAILABLE:
-                raise ValueError("DOCX support requires python-docx library")
-            return FileProcessor._extract_docx(file_path)
-        else:
-            raise ValueError(f"Unsupported file format: {extension}")
+        stat = os.stat(file_path)
+        try:
+            return _extract_text_cached(os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+        except IncompleteExtraction as e:
+            # Not cached (the exception skips both caches), so the next
+            # extraction of this file tries again
+            print(f"Incomplete text extracted from {file_path}: {e.reason}")
+            return e.text
+    
+    @staticmethod
+    def extract_many(file_paths: List[str], max_workers: Optional[int] = None,
+                     max_bytes_in_flight: Optional[int] = None) -> Iterator[Tuple[str, str]]:
+        """
+        Extract text from many files in parallel worker processes.
+        
+        Results are yielded as soon as each file is done, not in input
+        order, so a slow PDF doesn't hold back quick text files and callers
+        can hand each text on (e.g. to the embedder) while others are still
+        being parsed. New files are only submitted while the total size of
+        the files in flight is under `max_bytes_in_flight`, which bounds how
+        much extracted text can pile up in this process.
+        
+        Files that fail to extract are logged and skipped.
+        
+        Args:
+            file_paths: Paths of the files to extract
+            max_workers: Number of worker processes (defaults to CPU count)
+            max_bytes_in_flight: Input size cap (defaults to MAX_BYTES_IN_FLIGHT)
+            
+        Yields:
+            (file_path, text) tuples in completion order
+        """
+        if len(file_paths) <= 1:
+            for file_path in file_paths:
+                try:
+                    text = FileProcessor.extract_text(file_path)
+                except Exception as e:
+                    print(f"Failed to extract text from {file_path}: {e}")
+                    continue
+                yield file_path, text
+            return
+        
+        max_bytes = max_bytes_in_flight or FileProcessor.MAX_BYTES_IN_FLIGHT
+        workers = min(len(file_paths), max_workers or os.cpu_count() or 1)
+        pending = iter(file_paths)
+        in_flight = {}
+        bytes_in_flight = 0
+        
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_disable_pdf_page_parallelism) as executor:
+            while True:
+                # Keep every worker busy, but always allow at least one file
+                # in flight so a single huge file can't stall the batch
+                while len(in_flight) < workers and (not in_flight or bytes_in_flight < max_bytes):
+                    file_path = next(pending, None)
+                    if file_path is None:
+                        break
+                    try:
+                        size = os.path.getsize(file_path)
+                    except OSError:
+                        size = 0  # extract_text will report the error
+                    future = executor.submit(FileProcessor.extract_text, file_path)
+                    in_flight[future] = (file_path, size)
+                    bytes_in_flight += size
+                
+                if not in_flight:
+                    return
+                
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    file_path, size = in_flight.pop(future)
+                    bytes_in_flight -= size
+                    try:
+                        text = future.result()
+                    except Exception as e:
+                        print(f"Failed to extract text from {file_path}: {e}")
+                        continue
+                    yield file_path, text
     
     @staticmethod
     def _extract_pdf(file_path: str) -> str:
         """Extract text from PDF file."""
-        text_parts = []
+        if _import_pymupdf() is not None:
+            return FileProcessor._extract_pdf_pymupdf(file_path)
+        return FileProcessor._extract_pdf_pypdf2(file_path)
+    
+    @staticmethod
+    def _extract_pdf_pymupdf(file_path: str) -> str:
+        """
+        Extract text from PDF file using PyMuPDF.
+        
+        Uses the "blocks" mode, which avoids building per-span Python
+        objects like the "dict" mode does and lets empty pages be skipped
+        cheaply. Large PDFs are split into page ranges parsed in parallel
+        processes only for synchronous `extract_text` callers; the request
+        path and `extract_many` workers parse in-process (see
+        `_pdf_page_parallelism`).
+        """
+        page_texts = FileProcessor._extract_pdf_pages(file_path)
+        
+        # Mostly scanned documents: send the low-text pages to OCR
+        page_count = len(page_texts)
+        ocr_failed = 0
+        if OCR_ENDPOINT and page_count and sum(map(len, page_texts)) < OCR_MIN_PAGE_CHARS * page_count:
+            low_text = [
+                page_num for page_num, text in enumerate(page_texts)
+                if len(text.strip()) < OCR_MIN_PAGE_CHARS
+            ]
+            ocr_texts = _ocr_pdf_pages(file_path, low_text)
+            for page_num, text in ocr_texts.items():
+                page_texts[page_num] = text
+            ocr_failed = len(low_text) - len(ocr_texts)
+        
+        # Scanned/image-only pages yield no text; report them rather than
+        # dropping their content silently
+        skipped = page_texts.count('')
+        if skipped:
+            hint = "" if OCR_ENDPOINT else " (set RAG_OCR_ENDPOINT to OCR them)"
+            print(f"Skipped {skipped}/{page_count} PDF pages without extractable text in {file_path}{hint}")
+        
+        text = _join_nonblank(page_texts, page_count)
+        if ocr_failed:
+            raise IncompleteExtraction(text, f"OCR failed for {ocr_failed} pages")
+        return text
+    
+    @staticmethod
+    def _extract_pdf_pages(file_path: str) -> List[str]:
+        """
+        Extract per-page texts with PyMuPDF, '' for pages without text.
+        """
+        with _import_pymupdf().open(file_path) as doc:
+            page_count = doc.page_count
+            workers = min(os.cpu_count() or 1, page_count // FileProcessor.PDF_PARALLEL_MIN_PAGES)
+            if workers < 2 or getattr(_pdf_page_parallelism, 'disabled', False):
+                return [_pdf_page_text(page) for page in doc]
+        
+        # Contiguous page ranges, one per worker, joined back in page order
+        bounds = [page_count * i // workers for i in range(workers + 1)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            ranges = executor.map(
+                _extract_pdf_page_range, repeat(file_path), bounds[:-1], bounds[1:]
+            )
+            return list(chain.from_iterable(ranges))
+    
+    @staticmethod
+    def _extract_pdf_pypdf2(file_path: str) -> str:
+        """Extract text from PDF file using PyPDF2 (pure-Python fallback)."""
+        try:
+            import PyPDF2
+        except ImportError:
+            raise ValueError("PDF support requires PyMuPDF or PyPDF2")
         
         with open(file_path, 'rb') as file:
             pdf_reader = PyPDF2.PdfReader(file)
-            
-            for page_num, page in enumerate(pdf_reader.pages):
-                text = page.extract_text()
-                if text.strip():
-                    text_parts.append(text)
+            pages = pdf_reader.pages
+            return _join_nonblank((page.extract_text() for page in pages), len(pages))
+    
+    @staticmethod
+    def _read_text(file_path: str) -> str:
+        """
+        Read a text file in one decode call.
         
-        return '\n\n'.join(text_parts)
+        UTF-8 unless a byte order mark says otherwise; undecodable bytes
+        become U+FFFD rather than being dropped silently.
+        """
+        if os.path.getsize(file_path) > FileProcessor.MMAP_MIN_BYTES:
+            with open(file_path, 'rb') as file, \
+                    mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return str(mapped, _sniff_encoding(mapped[:4]), 'replace')
+        data = Path(file_path).read_bytes()
+        return data.decode(_sniff_encoding(data[:4]), 'replace')
     
     @staticmethod
     def _extract_txt(file_path: str) -> str:
         """Extract text from plain text file."""
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-            return file.read()
+        return FileProcessor._read_text(file_path)
     
     @staticmethod
     def _extract_markdown(file_path: str) -> str:
@@ -81,27 +867,217 @@ class FileProcessor:
         
         Converts markdown to plain text while preserving structure.
         """
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-            md_content = file.read()
-            
-        # Convert markdown to HTML, then strip HTML tags for plain text
-        # For RAG purposes, we want the content without markdown syntax
-        html = markdown.markdown(md_content)
+        md_content = FileProcessor._read_text(file_path)
         
-        # Simple HTML tag removal (good enough for this project)
-        import re
-        text = re.sub('<[^<]+?>', '', html)
+        # For RAG purposes, we want the content without markdown syntax
+        markdown_to_text = _markdown_to_text()
+        if markdown_to_text is not None:
+            return markdown_to_text(md_content)
         
-        return text
+        return _markdown_to_plain_text(md_content)
     
     @staticmethod
     def _extract_docx(file_path: str) -> str:
-        """Extract text from DOCX file."""
-        doc = Document(file_path)
-        text_parts = []
+        """
+        Extract text from DOCX file.
+        
+        Streams paragraphs out of word/document.xml with lxml's iterparse
+        instead of building a python-docx Document (a full DOM plus styles,
+        numbering and relationship parts), and frees each paragraph once
+        read, so memory stays flat regardless of document size.
+        """
+        try:
+            from lxml import etree
+        except ImportError:
+            raise ValueError("DOCX support requires lxml library")
+        
+        with zipfile.ZipFile(file_path) as archive, archive.open('word/document.xml') as stream:
+            return _join_nonblank(_iter_docx_paragraphs(etree, stream))
+
+
+# WordprocessingML namespace, and the run content that contributes text:
+# text, tabs and line breaks (only as children of a run; w:tab also
+# defines tab stops in paragraph properties)
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_DOCX_RUN_TEXT = {f'{_W}tab': '\t', f'{_W}br': '\n', f'{_W}cr': '\n'}
+
+# Markup-compatibility fallback content. Word writes text boxes and other
+# newer constructs twice, under mc:Choice and again under mc:Fallback for
+# older readers, so fallback subtrees are skipped.
+_MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+
+
+def _iter_docx_paragraphs(etree, stream) -> Iterator[str]:
+    """
+    Yield the text of each paragraph in a DOCX document.xml stream.
+    
+    Text is collected per run element rather than with itertext(), and a
+    paragraph nested in another one (e.g. inside a text box) is yielded on
+    its own instead of also being repeated in its parent.
+    
+    Entities are never resolved and no DTD or network access happens, so an
+    uploaded document can't pull local files or URLs into its text. Word
+    never writes a DOCTYPE, so a document declaring one is rejected.
+    
+    Raises:
+        ValueError: If the document declares a DOCTYPE
+    """
+    stack = []
+    fallback_depth = 0
+    doctype_checked = False
+    events = etree.iterparse(
+        stream, events=('start', 'end'),
+        tag=(f'{_W}p', f'{_W}t', _MC_FALLBACK, *_DOCX_RUN_TEXT),
+        resolve_entities=False, load_dtd=False, no_network=True
+    )
+    for event, element in events:
+        if not doctype_checked:
+            # The prolog has been parsed by the time of the first event
+            if element.getroottree().docinfo.doctype:
+                raise ValueError("DOCX document.xml must not declare a DOCTYPE")
+            doctype_checked = True
         
-        for paragraph in doc.paragraphs:
-            if paragraph.text.strip():
-                text_parts.append(paragraph.text)
+        tag = element.tag
+        if tag == _MC_FALLBACK:
+            if event == 'start':
+                fallback_depth += 1
+                continue
+            fallback_depth -= 1
+        elif fallback_depth:
+            continue
+        elif event == 'start':
+            if tag == f'{_W}p':
+                stack.append([])
+            continue
+        elif tag == f'{_W}p':
+            yield ''.join(stack.pop())
+        elif stack:
+            if tag == f'{_W}t':
+                # lxml builds a new str on every .text access, so read it once
+                text = element.text
+                if text:
+                    stack[-1].append(text)
+            elif element.getparent().tag == f'{_W}r':
+                stack[-1].append(_DOCX_RUN_TEXT[tag])
         
-        return '\n\n'.join(text_parts)
+        # Drop the element and any already-processed siblings
+        element.clear()
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+
+# Extractor for each supported extension (lowercase, with leading dot)
+_HANDLERS = {
+    '.pdf': FileProcessor._extract_pdf,
+    '.txt': FileProcessor._extract_txt,
+    '.md': FileProcessor._extract_markdown,
+    '.markdown': FileProcessor._extract_markdown,
+    '.docx': FileProcessor._extract_docx,
+}
+
+
+def _file_digest(file_path: str) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    with open(file_path, 'rb') as file:
+        if hasattr(hashlib, 'file_digest'):  # Python 3.11+
+            return hashlib.file_digest(file, 'sha256').hexdigest()
+        digest = hashlib.sha256()
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(block)
+        return digest.hexdigest()
+
+
+def _cache_variant(extension: str) -> str:
+    """
+    Describe what produced the text for a file type, for the cache key.
+    
+    Covers the extractor version and the optional backend in use, so
+    installing or removing a parser library doesn't keep serving text
+    from the other one.
+    """
+    variant = f"-v{EXTRACT_CACHE_VERSION}"
+    if extension == '.pdf':
+        if _import_pymupdf() is None:
+            variant += "-pypdf2"
+        else:
+            variant += "-pymupdf"
+            if OCR_ENDPOINT:
+                # Model names contain '/', so key by a short hash of the name
+                variant += "-ocr-" + hashlib.sha256(OCR_MODEL.encode('utf-8')).hexdigest()[:12]
+    elif extension in ('.md', '.markdown'):
+        variant += "-mistune" if _markdown_to_text() is not None else "-plain"
+    return variant
+
+
+def _prune_extract_cache():
+    """
+    Evict least recently used cache entries until the cache directory is
+    under EXTRACT_CACHE_MAX_BYTES. Cache hits refresh an entry's mtime, so
+    mtime order is use order.
+    """
+    entries = []
+    total = 0
+    for entry in os.scandir(EXTRACT_CACHE_DIR):
+        if entry.name.endswith('.z'):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+            total += stat.st_size
+    
+    if total <= EXTRACT_CACHE_MAX_BYTES:
+        return
+    
+    entries.sort()
+    for _, entry_size, path in entries:
+        try:
+            os.remove(path)
+        except OSError:
+            continue  # already evicted by another process
+        total -= entry_size
+        if total <= EXTRACT_CACHE_MAX_BYTES:
+            break
+
+
+@functools.lru_cache(maxsize=128)
+def _extract_text_cached(file_path: str, size: int, mtime_ns: int) -> str:
+    """
+    Extract text, consulting the on-disk cache first.
+    
+    size and mtime_ns are part of the in-process cache key only, so a
+    modified file is never served from it. Cache I/O failures fall back to
+    extracting directly.
+    """
+    # os.path.splitext avoids constructing a Path just for the suffix
+    extension = os.path.splitext(file_path)[1].lower()
+    
+    # Checked before hashing so unsupported files aren't read
+    handler = _HANDLERS.get(extension)
+    if handler is None:
+        raise ValueError(f"Unsupported file format: {extension}")
+    
+    cache_path = EXTRACT_CACHE_DIR / f"{_file_digest(file_path)}{_cache_variant(extension)}{extension}.z"
+    try:
+        text = zlib.decompress(cache_path.read_bytes()).decode('utf-8')
+    except (OSError, zlib.error):
+        pass
+    else:
+        try:
+            os.utime(cache_path)  # mark as recently used for eviction
+        except OSError:
+            pass
+        return text
+    
+    text = handler(file_path)
+    
+    try:
+        EXTRACT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f'.{os.getpid()}.tmp')
+        tmp_path.write_bytes(zlib.compress(text.encode('utf-8'), 1))
+        os.replace(tmp_path, cache_path)
+        _prune_extract_cache()
+    except OSError as e:
+        print(f"Failed to cache extracted text for {file_path}: {e}")
+    
+    return text